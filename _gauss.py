@@ -0,0 +1,91 @@
+"""
+Compiled elimination kernels used by LinearSystem.
+
+Both kernels work in place on the contiguous float64 augmented matrix
+of a LinearSystem and give the same results as its NumPy row operations.
+A built _linsys_core extension (see _linsys_core.pyx) is preferred;
+otherwise the kernels below are compiled with numba. When neither is
+available, triangularize and rref are None and LinearSystem uses the
+NumPy row operations instead.
+"""
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def _triangularize(A, eps):
+    """
+    Brings A to triangular form, the same way as
+    LinearSystem.compute_triangular_form.
+    """
+    num_equations, num_columns = A.shape
+    num_variables = num_columns - 1
+    j = 0
+    for row in range(num_equations):
+        while j < num_variables:
+            if abs(A[row, j]) < eps:
+                i = row + np.argmax(np.abs(A[row:, j]))
+                if abs(A[i, j]) < eps:
+                    j += 1
+                    continue
+                for k in range(num_columns):
+                    A[row, k], A[i, k] = A[i, k], A[row, k]
+
+            inv_pivot = 1.0 / A[row, j]
+            for i in range(row+1, num_equations):
+                if abs(A[i, j]) >= eps:
+                    factor = A[i, j] * inv_pivot
+                    for k in range(num_columns):
+                        A[i, k] -= factor * A[row, k]
+                    A[i, j] = 0.0
+            j += 1
+            break
+
+
+def _rref(A, eps):
+    """
+    Brings A to reduced row echelon form in a single Gauss-Jordan pass,
+    the same way as LinearSystem.do_gauss_jordan_elimination.
+    """
+    num_equations, num_columns = A.shape
+    num_variables = num_columns - 1
+    row = 0
+    for j in range(num_variables):
+        if row == num_equations:
+            break
+        i = row + np.argmax(np.abs(A[row:, j]))
+        if abs(A[i, j]) < eps:
+            continue
+        if i != row:
+            for k in range(num_columns):
+                A[row, k], A[i, k] = A[i, k], A[row, k]
+
+        pivot = A[row, j]
+        for k in range(num_columns):
+            A[row, k] /= pivot
+
+        for i in range(num_equations):
+            if i != row and abs(A[i, j]) >= eps:
+                factor = A[i, j]
+                for k in range(num_columns):
+                    A[i, k] -= factor * A[row, k]
+                A[i, j] = 0.0
+        row += 1
+
+
+# Uncompiled, these loops are slower than LinearSystem's NumPy row
+# operations, so they are only exposed when numba can compile them.
+if njit is not None:
+    _triangularize = njit(cache=True)(_triangularize)
+    _rref = njit(cache=True)(_rref)
+    triangularize, rref = _triangularize, _rref
+else:
+    triangularize = rref = None
+
+try:
+    from _linsys_core import triangularize, rref
+except ImportError:
+    pass
@@ -0,0 +1,99 @@
+# cython: language_level=3
+"""
+Cython build of the LinearSystem elimination kernels.
+
+Both functions work in place on the contiguous float64 augmented matrix
+of a LinearSystem. Build the extension next to linear_system.py with:
+    cythonize -i _linsys_core.pyx
+linear_system.py uses the Numba/NumPy code when it is not built.
+"""
+cimport cython
+from libc.math cimport fabs
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+def triangularize(double[:, ::1] A, double eps):
+    """
+    Brings A to triangular form, the same way as
+    LinearSystem.compute_triangular_form.
+    """
+    cdef Py_ssize_t num_equations = A.shape[0]
+    cdef Py_ssize_t num_columns = A.shape[1]
+    cdef Py_ssize_t num_variables = num_columns - 1
+    cdef Py_ssize_t row, i, k, p
+    cdef Py_ssize_t j = 0
+    cdef double largest, inv_pivot, factor, tmp
+
+    for row in range(num_equations):
+        while j < num_variables:
+            if fabs(A[row, j]) < eps:
+                p = row
+                largest = fabs(A[row, j])
+                for i in range(row+1, num_equations):
+                    if fabs(A[i, j]) > largest:
+                        largest = fabs(A[i, j])
+                        p = i
+                if largest < eps:
+                    j += 1
+                    continue
+                for k in range(num_columns):
+                    tmp = A[row, k]
+                    A[row, k] = A[p, k]
+                    A[p, k] = tmp
+
+            inv_pivot = 1.0 / A[row, j]
+            for i in range(row+1, num_equations):
+                if fabs(A[i, j]) >= eps:
+                    factor = A[i, j] * inv_pivot
+                    for k in range(num_columns):
+                        A[i, k] -= factor * A[row, k]
+                    A[i, j] = 0.0
+            j += 1
+            break
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+def rref(double[:, ::1] A, double eps):
+    """
+    Brings A to reduced row echelon form in a single Gauss-Jordan pass,
+    the same way as LinearSystem.do_gauss_jordan_elimination.
+    """
+    cdef Py_ssize_t num_equations = A.shape[0]
+    cdef Py_ssize_t num_columns = A.shape[1]
+    cdef Py_ssize_t num_variables = num_columns - 1
+    cdef Py_ssize_t i, k, j, p
+    cdef Py_ssize_t row = 0
+    cdef double largest, pivot, factor, tmp
+
+    for j in range(num_variables):
+        if row == num_equations:
+            break
+        p = row
+        largest = fabs(A[row, j])
+        for i in range(row+1, num_equations):
+            if fabs(A[i, j]) > largest:
+                largest = fabs(A[i, j])
+                p = i
+        if largest < eps:
+            continue
+        if p != row:
+            for k in range(num_columns):
+                tmp = A[row, k]
+                A[row, k] = A[p, k]
+                A[p, k] = tmp
+
+        pivot = A[row, j]
+        for k in range(num_columns):
+            A[row, k] /= pivot
+
+        for i in range(num_equations):
+            if i != row and fabs(A[i, j]) >= eps:
+                factor = A[i, j]
+                for k in range(num_columns):
+                    A[i, k] -= factor * A[row, k]
+                A[i, j] = 0.0
+        row += 1
@@ -1,7 +1,17 @@
-import math
+from math import fabs
+
+import numpy as np
+
 from vector import Vector
 
 
+_NEAR_ZERO = 1e-10
+
+
+def _is_near_zero(item):
+    return fabs(item) < _NEAR_ZERO
+
+
 class Line(object):
     """
     This class gives simple functionalities related to a line in 2d
@@ -21,19 +31,38 @@ class Line(object):
     This will generate a line of the form, 2x + 3y = 5
     """
 
-    NO_NONZERO_ELTS_FOUND_MSG = 'No nonzero elements found'
-    
+    __slots__ = ('dimension', 'normal_vector', 'constant_term', '_pivot_index',
+                 '_basepoint', '_basepoint_is_stale', '_rounded_equation')
+
     def __init__(self, normal_vector=None, constant_term=None):
         self.dimension = 2
         if not normal_vector:
             normal_vector = Vector([0]*self.dimension)
-        self.normal_vector = normal_vector
-        
+
         if not constant_term:
             constant_term = 0
+
+        self.set_normal_and_constant(normal_vector, constant_term)
+
+    def set_normal_and_constant(self, normal_vector, constant_term):
+        """
+        updates the normal_vector and constant_term of the line in place.
+
+        The basepoint is not recomputed here; it is computed on its
+        first access after the update.
+        """
+        self.normal_vector = normal_vector
         self.constant_term = constant_term
-        
-        self.set_basepoint()
+        # Index of the first nonzero coefficient, -1 for a zero normal vector.
+        self._pivot_index = Line.first_nonzero_index(normal_vector.coordinates.tolist())
+        self._basepoint_is_stale = True
+        self._rounded_equation = None
+
+    @property
+    def basepoint(self):
+        if self._basepoint_is_stale:
+            self.set_basepoint()
+        return self._basepoint
 
     def set_basepoint(self):
         """
@@ -43,22 +72,17 @@ class Line(object):
         Use of first non zero coefficient is done to compute the
         basepoint.
         """
-        try:
-            n = self.normal_vector.coordinates
-            c = self.constant_term
-            basepoint_coords = [0]*self.dimension
-
-            initial_index = Line.first_nonzero_index(n)
-            initial_coefficient = n[initial_index]
-
-            basepoint_coords[initial_index] = c/initial_coefficient
-            self.basepoint = Vector(basepoint_coords)
-
-        except Exception as e:
-            if str(e) == Line.NO_NONZERO_ELTS_FOUND_MSG:
-                self.basepoint = None
-            else:
-                raise e
+        self._basepoint_is_stale = False
+        initial_index = self._pivot_index
+        if initial_index < 0:
+            self._basepoint = None
+            return
+
+        n = self.normal_vector.coordinates.tolist()
+        c = self.constant_term
+        basepoint_coords = [0]*self.dimension
+        basepoint_coords[initial_index] = c/n[initial_index]
+        self._basepoint = Vector(basepoint_coords)
 
     def find_point_of_intersection(self, l):
         """
@@ -70,25 +94,19 @@ class Line(object):
         2. None if the lines are parallel
         3. Else Point of intersection
         """
-        try:
-
-            l1 = self.normal_vector.coordinates
-            l2 = l.normal_vector.coordinates
-            k1 = self.constant_term
-            k2 = l.constant_term
+        A, B = self.normal_vector.coordinates.tolist()
+        C, D = l.normal_vector.coordinates.tolist()
+        k1 = self.constant_term
+        k2 = l.constant_term
 
-            den = l1[0] * l2[1] - l1[1] * l2[0]
-            A, B = l1
-            C, D = l2
-            x_numerator = (D * k1 - B * k2)
-            y_numerator = (-C * k1 + A * k2)
+        # |den| = |n1| * |n2| * sin(angle), so the tolerance is relative to
+        # the magnitudes, as in Vector.is_parallel_to.
+        den = A * D - B * C
+        if fabs(den) <= _NEAR_ZERO * self.normal_vector.magnitude() * l.normal_vector.magnitude():
+            return self if self == l else None
 
-            return Vector([x_numerator, y_numerator]) * (1 / den)
-        except ZeroDivisionError:
-            if self == l:
-                return self
-            else:
-                return None
+        inv = 1 / den
+        return Vector([inv * (D * k1 - B * k2), inv * (A * k2 - C * k1)])
 
     def __str__(self):
         """
@@ -97,41 +115,35 @@ class Line(object):
 
         num_decimal_places = 3
 
-        def write_coefficient(coefficient, is_initial_term = False):
-            coefficient = round(coefficient, num_decimal_places)
-
-            if coefficient % 1 == 0:
-                coefficient = int(coefficient)
+        def write_number(number):
+            output = '{:.{}f}'.format(number, num_decimal_places).rstrip('0').rstrip('.')
+            return '0' if output == '-0' else output
 
+        def write_coefficient(coefficient, is_initial_term = False):
             output = ''
 
             if coefficient < 0:
                 output += '-'
-            if coefficient > 0 and not is_initial_term:
+            elif not is_initial_term:
                 output += '+'
-            if abs(coefficient) != 1:
-                output += '{}'.format(abs(coefficient))
+
+            magnitude = write_number(abs(coefficient))
+            if magnitude != '1':
+                output += magnitude
 
             return output
 
-        n = self.normal_vector
+        coefs = self.normal_vector.coordinates.tolist()
+        initial_index = self._pivot_index
 
-        try:
-            coefs = n.coordinates
-            initial_index = Line.first_nonzero_index(coefs)
+        if initial_index < 0:
+            output = '0'
+        else:
             terms = [write_coefficient(coefs[i], is_initial_term=(i==initial_index)) + 'x_{}'.format(i+1)
                      for i in range(self.dimension) if round(coefs[i], num_decimal_places) != 0]
             output = ' '.join(terms)
-        except Exception as e:
-            if str(e) == Line.NO_NONZERO_ELTS_FOUND_MSG:
-                output = '0'
-            else:
-                raise e
 
-        constant = round(self.constant_term, num_decimal_places)
-        if constant % 1 == 0:
-            constant = int(constant)
-        output += ' ={}'.format(constant)
+        output += ' ={}'.format(write_number(self.constant_term))
 
         return output
 
@@ -142,6 +154,12 @@ class Line(object):
         Two lines are equal if the vector from point on one line to
         point on another line is parallel to the normal of any of the line.
         """
+        if self is l:
+            return True
+        # Identical equations (up to rounding) are equal without the geometric test.
+        if self.rounded_equation() == l.rounded_equation():
+            return True
+
         if self.normal_vector.is_zero():
             if not l.normal_vector.is_zero():
                 return False
@@ -150,7 +168,7 @@ class Line(object):
                 # If normal vectors of both lines are zero
                 # we check if the constant_term of both lines are eqaul
                 # if yes then they are equal.
-                return Line.is_near_zero(diff)
+                return _is_near_zero(diff)
         elif l.normal_vector.is_zero():
             return False
 
@@ -159,6 +177,16 @@ class Line(object):
             return v.is_orthogonal_to(self.normal_vector)
         return False
 
+    def rounded_equation(self):
+        """
+        returns the coefficients followed by the constant term,
+        rounded to 10 decimal places, as a tuple.
+        """
+        if self._rounded_equation is None:
+            self._rounded_equation = (tuple(round(c, 10) for c in self.normal_vector.coordinates.tolist()) +
+                                      (round(self.constant_term, 10),))
+        return self._rounded_equation
+
     def is_parallel_to(self, l):
         """
         returns whether the two lines are parallel or not.
@@ -172,17 +200,43 @@ class Line(object):
         """
         Helper method to find that the item is tending to zero or not.
         """
-        return abs(item) < tolerance
+        return fabs(item) < tolerance
 
     @staticmethod
     def first_nonzero_index(iterable):
         """
         Helper method to find first nonzero coefficient index in iterable.
+        Returns -1 if all the items are zero.
         """
         for k, item in enumerate(iterable):
-            if not Line.is_near_zero(item):
+            if not _is_near_zero(item):
                 return k
-        raise Exception(Line.NO_NONZERO_ELTS_FOUND_MSG)
+        return -1
+
+
+def find_intersections(N1, k1, N2, k2):
+    """
+    Batched version of Line.find_point_of_intersection.
+    params:
+        N1, N2: arrays of shape (n, 2) holding the normal vectors
+        k1, k2: arrays of shape (n,) holding the constant terms
+
+    returns an array of shape (n, 2) where row i is the point of
+    intersection of lines N1[i].x = k1[i] and N2[i].x = k2[i].
+    Rows for parallel or equal lines are nan.
+    """
+    N1 = np.asarray(N1, dtype=np.float64)
+    N2 = np.asarray(N2, dtype=np.float64)
+    k1 = np.asarray(k1, dtype=np.float64)
+    k2 = np.asarray(k2, dtype=np.float64)
+
+    den = N1[:, 0] * N2[:, 1] - N1[:, 1] * N2[:, 0]
+    # Same tolerance, relative to |n1| * |n2|, as find_point_of_intersection.
+    norms = np.hypot(N1[:, 0], N1[:, 1]) * np.hypot(N2[:, 0], N2[:, 1])
+    inv = 1 / np.where(np.abs(den) <= _NEAR_ZERO * norms, np.nan, den)
+    x = inv * (N2[:, 1] * k1 - N1[:, 1] * k2)
+    y = inv * (N1[:, 0] * k2 - N2[:, 0] * k1)
+    return np.stack([x, y], axis=1)
 
 if __name__ == '__main__':
     def find_intersection(a, b, k1, c, d, k2):
@@ -194,4 +248,10 @@ if __name__ == '__main__':
 
     find_intersection(4.046, 2.836, 1.21, 10.115, 7.09, 3.025)
     find_intersection(7.204, 3.182, 8.68, 8.172, 4.114, 9.883)
-    find_intersection(1.182, 5.562, 6.744, 1.773, 8.343, 9.525)
\ No newline at end of file
+    find_intersection(1.182, 5.562, 6.744, 1.773, 8.343, 9.525)
+
+    print("Batched intersections of the lines above:")
+    print(find_intersections([[4.046, 2.836], [7.204, 3.182], [1.182, 5.562]],
+                             [1.21, 8.68, 6.744],
+                             [[10.115, 7.09], [8.172, 4.114], [1.773, 8.343]],
+                             [3.025, 9.883, 9.525]))
\ No newline at end of file
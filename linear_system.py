@@ -1,7 +1,24 @@
-from copy import deepcopy
+import warnings
+from math import fabs
+
+import numpy as np
+
+try:
+    from scipy.linalg import LinAlgWarning, lu_factor, lu_solve
+except ImportError:
+    lu_factor = None
 
 from vector import Vector
 from plane import Plane
+from _gauss import triangularize as _triangularize, rref as _rref
+
+
+_NEAR_ZERO = 1e-10
+
+
+def _is_near_zero(val):
+    return fabs(val) < _NEAR_ZERO
+
 
 class LinearSystem(object):
 
@@ -15,13 +32,26 @@ class LinearSystem(object):
             for p in planes:
                 assert p.dimension == d
 
-            self.planes = planes
+            # Augmented matrix [normal_vector | constant_term], one row per plane.
+            self._matrix = np.empty((len(planes), d + 1))
+            for i, p in enumerate(planes):
+                self._matrix[i, :-1] = p.normal_vector.coordinates
+                self._matrix[i, -1] = p.constant_term
             self.dimension = d
+            # Rows are materialized as the class they were given as (Line or Plane).
+            self._row_type = type(planes[0])
         except AssertionError:
             raise Exception(self.ALL_PLANES_MUST_BE_IN_SAME_DIM_MSG)
 
 
     def compute_solution(self):
+        # The LU path only pays off over the NumPy row operations; the
+        # compiled rref kernels are faster on these small systems.
+        if lu_factor is not None and _rref is None:
+            solution = self.solve_square_system_with_lu()
+            if solution is not None:
+                return solution
+
         try:
             return self.do_gaussian_elimination_and_parametrize_solution()
         except Exception as e:
@@ -30,74 +60,131 @@ class LinearSystem(object):
             else:
                 raise e
 
+    def solve_square_system_with_lu(self):
+        # LAPACK fast path for a unique solution. Returns None when the system,
+        # without its 0 = 0 rows, is not square or is singular; those cases
+        # need the pivot structure of the RREF.
+        A = self._matrix[np.any(np.abs(self._matrix) >= _NEAR_ZERO, axis=1)]
+        if len(A) != self.dimension:
+            return None
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', LinAlgWarning)
+            lu, piv = lu_factor(A[:, :-1], check_finite=False)
+        # Singular up to a tolerance relative to the size of the coefficients.
+        eps = _NEAR_ZERO * np.abs(A[:, :-1]).max()
+        if np.any(np.abs(np.diag(lu)) < eps):
+            return None
+
+        x = lu_solve((lu, piv), A[:, -1], check_finite=False)
+        return Parametrization(Vector(x.tolist()), [])
+
     def do_gaussian_elimination_and_parametrize_solution(self):
-        rref = self.compute_rref()
+        tolerance = self._tolerance()
+        rref = self.compute_rref(tolerance)
 
-        rref.raise_exception_if_contradictory_equations()
+        rref.raise_exception_if_contradictory_equations(tolerance)
 
-        direction_vectors = rref.extract_direction_vectors_for_parametrization()
-        basepoint = rref.extract_basepoint_for_parametrization()
+        direction_vectors = rref.extract_direction_vectors_for_parametrization(tolerance)
+        basepoint = rref.extract_basepoint_for_parametrization(tolerance)
 
         return Parametrization(basepoint, direction_vectors)
 
-    def raise_exception_if_contradictory_equations(self):
-        for p in self.planes:
-            try:
-                p.first_nonzero_index(p.normal_vector.coordinates)
-            except Exception as e:
-                if str(e) == Plane.NO_NONZERO_ELTS_FOUND_MSG:
-                    if not LinearSystem.is_near_zero(p.constant_term):
-                        raise Exception(self.NO_SOLUTIONS_MSG)
-                else:
-                    raise e
-
-    def extract_direction_vectors_for_parametrization(self):
+    def raise_exception_if_contradictory_equations(self, tolerance=_NEAR_ZERO):
+        # A row 0 = k with k nonzero has no solution.
+        is_nonzero = np.abs(self._matrix) >= tolerance
+        if np.any(is_nonzero[:, -1] & ~is_nonzero[:, :-1].any(axis=1)):
+            raise Exception(self.NO_SOLUTIONS_MSG)
+
+    def extract_direction_vectors_for_parametrization(self, tolerance=_NEAR_ZERO):
         num_variables = self.dimension
-        pivot_indices = self.indices_of_first_nonzero_terms_in_each_row()
+        pivot_indices = self.indices_of_first_nonzero_terms_in_each_row(tolerance)
         free_variables_indices = set(range(num_variables)) - set(pivot_indices)
 
         direction_vectors = []
+        rows = self._matrix.tolist()
 
         for free_var in free_variables_indices:
             vector_coords = [0] * num_variables
             vector_coords[free_var] = 1
-            for i, p in enumerate(self.planes):
+            for i, row in enumerate(rows):
                 pivot_var = pivot_indices[i]
                 if pivot_var < 0:
                     break
-                vector_coords[pivot_var] = -p.normal_vector.coordinates[free_var]
+                vector_coords[pivot_var] = -row[free_var]
             direction_vectors.append(Vector(vector_coords))
 
         return direction_vectors
 
-    def extract_basepoint_for_parametrization(self):
+    def extract_basepoint_for_parametrization(self, tolerance=_NEAR_ZERO):
         num_variables = self.dimension
-        pivot_indices = self.indices_of_first_nonzero_terms_in_each_row()
+        pivot_indices = self.indices_of_first_nonzero_terms_in_each_row(tolerance)
 
         basepoint_coords = [0] * num_variables
 
-        for i, p in enumerate(self.planes):
+        for i, row in enumerate(self._matrix.tolist()):
             pivot_var = pivot_indices[i]
             if pivot_var < 0:
                 break
-            basepoint_coords[pivot_var] = p.constant_term
+            basepoint_coords[pivot_var] = row[-1]
 
         return Vector(basepoint_coords)
 
     def compute_triangular_form(self):
-        system = deepcopy(self)
+        system = self._clone_numeric()
+        if _triangularize is not None:
+            _triangularize(system._matrix, _NEAR_ZERO)
+            return system
+
+        A = system._matrix
+        num_equations = len(system)
+        row = 0
+        for j in range(self.dimension):
+            if row == num_equations:
+                break
 
+            # One near-zero mask per column serves the pivot search and the
+            # choice of rows to eliminate.
+            magnitudes = np.abs(A[row:, j])
+            is_nonzero = magnitudes >= _NEAR_ZERO
+            if not is_nonzero[0]:
+                if not is_nonzero.any():
+                    continue
+                i = int(np.argmax(magnitudes))
+                system.swap_rows(row, row+i)
+                is_nonzero[[0, i]] = is_nonzero[[i, 0]]
+
+            rows = row + 1 + np.flatnonzero(is_nonzero[1:])
+            factors = A[rows, j] * (1.0 / A[row, j])
+            A[rows] -= np.outer(factors, A[row])
+            # Drop the rounding residue left in the eliminated column.
+            A[rows, j] = 0.0
+            row += 1
+
+        return system
+
+    def compute_triangular_form_sparse(self):
+        # Opt-in variant for sparse systems (Markowitz row ordering): the pivot
+        # row is the remaining row with a nonzero coefficient in the pivot
+        # column that has the fewest nonzero coefficients, to limit fill-in.
+        system = self._clone_numeric()
+
+        A = system._matrix
         num_equations = len(system)
         num_variables = self.dimension
         j = 0
         for row in range(num_equations):
             while j < num_variables:
-                curr_coef = system[row].normal_vector.coordinates[j]
-                if LinearSystem.is_near_zero(curr_coef):
-                    is_swapped = system.swap_with_row_below_for_nonzero_coefficient(row, j)
-                    if not is_swapped:
-                        j += 1
-                        continue
+                is_nonzero = np.abs(A[row:, :-1]) >= _NEAR_ZERO
+                candidates = np.flatnonzero(is_nonzero[:, j])
+                if len(candidates) == 0:
+                    j += 1
+                    continue
+
+                nnz_per_row = np.count_nonzero(is_nonzero[candidates], axis=1)
+                i = row + candidates[np.argmin(nnz_per_row)]
+                if i != row:
+                    system.swap_rows(row, i)
 
                 system.clear_coefficients_below(row, j)
                 j += 1
@@ -105,99 +192,110 @@ class LinearSystem(object):
 
         return system
 
-    def swap_with_row_below_for_nonzero_coefficient(self, row_above, coefficient):
-        for i in range(row_above, len(self)):
-            coef = self[i].normal_vector.coordinates[coefficient]
-            if not LinearSystem.is_near_zero(coef):
-                self.swap_rows(row_above, i)
-                return True
-        return False
-
-    def clear_coefficients_below(self, row, coefficient):
-        curr_coef = self[row].normal_vector.coordinates[coefficient]
-        for i in range(row+1, len(self)):
-            row_coef = self[i].normal_vector.coordinates[coefficient]
-            if not LinearSystem.is_near_zero(row_coef):
-                self.add_multiple_times_row_to_row(-row_coef / curr_coef,
-                                                   row, i)
-
-    def compute_rref(self):
-        tf = self.compute_triangular_form()
-
+    def _tolerance(self):
+        # Near-zero tolerance scaled to the largest coefficient, so the rounding
+        # residue of a system with large coefficients is not taken for a pivot.
+        return _NEAR_ZERO * max(1.0, float(np.abs(self._matrix[:, :-1]).max()))
+
+    def _clone_numeric(self):
+        # Copy only the augmented matrix; skips __init__ and deepcopy's recursion.
+        clone = object.__new__(type(self))
+        clone._matrix = self._matrix.copy()
+        clone.dimension = self.dimension
+        clone._row_type = self._row_type
+        return clone
+
+    def swap_with_row_below_for_nonzero_coefficient(self, row_above, coefficient, tolerance=_NEAR_ZERO):
+        # Partial pivoting: take the largest-magnitude coefficient in the column.
+        i = row_above + int(np.argmax(np.abs(self._matrix[row_above:, coefficient])))
+        if fabs(self._matrix[i, coefficient]) < tolerance:
+            return False
+        if i != row_above:
+            self.swap_rows(row_above, i)
+        return True
+
+    def clear_coefficients_below(self, row, coefficient, tolerance=_NEAR_ZERO):
+        # Rank-1 update of the rows below the pivot in one ufunc call;
+        # rows whose coefficient is already zero are left untouched.
+        inv_pivot = 1.0 / self._matrix[row, coefficient]
+        rows = row + 1 + np.flatnonzero(np.abs(self._matrix[row+1:, coefficient]) >= tolerance)
+        factors = self._matrix[rows, coefficient] * inv_pivot
+        self._matrix[rows] -= np.outer(factors, self._matrix[row])
+        # Drop the rounding residue left in the eliminated column.
+        self._matrix[rows, coefficient] = 0.0
+
+    def compute_rref(self, tolerance=None):
+        if tolerance is None:
+            tolerance = self._tolerance()
+        rref = self._clone_numeric()
+        if _rref is not None:
+            _rref(rref._matrix, tolerance)
+        else:
+            rref.do_gauss_jordan_elimination(tolerance)
+        return rref
+
+    def do_gauss_jordan_elimination(self, tolerance=_NEAR_ZERO):
+        # Single pass to RREF: each pivot row is scaled and its column cleared
+        # both above and below at once, instead of triangularizing first and
+        # sweeping back up afterwards.
+        A = self._matrix
         num_equations = len(self)
-        pivot_indices = tf.indices_of_first_nonzero_terms_in_each_row()
-
-        for row in range(num_equations-1, -1, -1):
-            j = pivot_indices[row]
-            if j < 0:
+        row = 0
+        for j in range(self.dimension):
+            if row == num_equations:
+                break
+            # Partial pivoting: the largest-magnitude coefficient in the column
+            # is always moved up, not only when the current one is zero.
+            if not self.swap_with_row_below_for_nonzero_coefficient(row, j, tolerance):
                 continue
-            tf.scale_row_to_make_coefficient_equal_to_one(row, j)
-            tf.clear_coefficients_above(row, j)
 
-        return tf
+            self.scale_row_to_make_coefficient_equal_to_one(row, j)
+            self.clear_coefficients_above(row, j, tolerance)
+            self.clear_coefficients_below(row, j, tolerance)
+            row += 1
 
     def scale_row_to_make_coefficient_equal_to_one(self, row, coefficient):
-        coef = self[row].normal_vector.coordinates[coefficient]
-        self.multiply_coefficient_and_row(1/coef, row)
+        self._matrix[row] /= self._matrix[row, coefficient]
 
-    def clear_coefficients_above(self, row, coefficient):
-        curr_coef = self[row].normal_vector.coordinates[coefficient]
-        for i in range(row-1, -1, -1):
-            row_coef = self[i].normal_vector.coordinates[coefficient]
-            if not LinearSystem.is_near_zero(row_coef):
-                self.add_multiple_times_row_to_row(-row_coef / curr_coef,
-                                                   row, i)
+    def clear_coefficients_above(self, row, coefficient, tolerance=_NEAR_ZERO):
+        inv_pivot = 1.0 / self._matrix[row, coefficient]
+        rows = np.flatnonzero(np.abs(self._matrix[:row, coefficient]) >= tolerance)
+        factors = self._matrix[rows, coefficient] * inv_pivot
+        self._matrix[rows] -= np.outer(factors, self._matrix[row])
+        self._matrix[rows, coefficient] = 0.0
 
     def swap_rows(self, row1, row2):
-        self[row1], self[row2] = self[row2], self[row1]
+        self._matrix[[row1, row2]] = self._matrix[[row2, row1]]
 
     def multiply_coefficient_and_row(self, coefficient, row):
-        n = self.planes[row].normal_vector
-        k = self.planes[row].constant_term
-
-        new_normal_vector = n * coefficient
-        new_constant_term = k * coefficient
-
-        self.planes[row] = Plane(normal_vector=new_normal_vector, constant_term=new_constant_term)
+        self._matrix[row] *= coefficient
 
     def add_multiple_times_row_to_row(self, coefficient, row_to_add, row_to_be_added_to):
-        n1 = self[row_to_add].normal_vector
-        n2 = self[row_to_be_added_to].normal_vector
-        k1 = self[row_to_add].constant_term
-        k2 = self[row_to_be_added_to].constant_term
-
-        new_normal_vector = n1 * coefficient + n2
-        new_constant_term = k1 * coefficient + k2
+        self._matrix[row_to_be_added_to] += coefficient * self._matrix[row_to_add]
 
-        self[row_to_be_added_to] = Plane(normal_vector=new_normal_vector, constant_term=new_constant_term)
+    def indices_of_first_nonzero_terms_in_each_row(self, tolerance=_NEAR_ZERO):
+        is_nonzero = np.abs(self._matrix[:, :-1]) >= tolerance
+        return np.where(is_nonzero.any(axis=1), is_nonzero.argmax(axis=1), -1).tolist()
 
-    def indices_of_first_nonzero_terms_in_each_row(self):
-        num_equations = len(self)
-        num_variables = self.dimension
-
-        indices = [-1] * num_equations
-
-        for i,p in enumerate(self.planes):
-            try:
-                indices[i] = p.first_nonzero_index(p.normal_vector.coordinates)
-            except Exception as e:
-                if str(e) == Plane.NO_NONZERO_ELTS_FOUND_MSG:
-                    continue
-                else:
-                    raise e
-
-        return indices
+    @property
+    def planes(self):
+        # The augmented matrix is the only storage; row objects are built on demand.
+        return [self[i] for i in range(len(self))]
 
     def __len__(self):
-        return len(self.planes)
+        return len(self._matrix)
 
     def __getitem__(self, i):
-        return self.planes[i]
+        # Planes are only materialized on access; row operations work on _matrix.
+        if isinstance(i, slice):
+            return [self[k] for k in range(*i.indices(len(self)))]
+        return self._row_type(normal_vector=Vector(self._matrix[i, :-1]), constant_term=float(self._matrix[i, -1]))
 
     def __setitem__(self, i, x):
         try:
             assert x.dimension == self.dimension
-            self.planes[i] = x
+            self._matrix[i, :-1] = x.normal_vector.coordinates
+            self._matrix[i, -1] = x.constant_term
 
         except AssertionError:
             raise Exception(self.ALL_PLANES_MUST_BE_IN_SAME_DIM_MSG)
@@ -210,7 +308,7 @@ class LinearSystem(object):
 
     @staticmethod
     def is_near_zero(val, eps=1e-10):
-        return abs(val) < eps
+        return fabs(val) < eps
 
 
 class Parametrization(object):
@@ -345,6 +443,18 @@ if __name__ == '__main__':
             t[2] == Plane(normal_vector=Vector([0, 0, -9]), constant_term=-2)):
         print ('test case 4 failed')
 
+    print('-'*80)
+    print("Testing for compute_triangular_form_sparse function")
+    p1 = Plane(normal_vector=Vector([1, 1, 1]), constant_term=1)
+    p2 = Plane(normal_vector=Vector([0, 1, 0]), constant_term=2)
+    p3 = Plane(normal_vector=Vector([1, 0, 0]), constant_term=3)
+    s = LinearSystem([p1,p2,p3])
+    t = s.compute_triangular_form_sparse()
+    if not (t[0] == p3 and
+            t[1] == p2 and
+            t[2] == Plane(normal_vector=Vector([0, 0, 1]), constant_term=-4)):
+        print ('test case 1 failed')
+
 
     print('-'*80)
     print("Testing RREF")
@@ -395,6 +505,32 @@ if __name__ == '__main__':
     if not s.compute_solution() == LinearSystem.NO_SOLUTIONS_MSG:
         print ("test case 1 failed")
 
+    p1 = Plane(normal_vector=Vector([0, 1, 1]), constant_term=1)
+    p2 = Plane(normal_vector=Vector([1, -1, 1]), constant_term=2)
+    p3 = Plane(normal_vector=Vector([1, 2, -5]), constant_term=3)
+    s = LinearSystem([p1, p2, p3])
+    sol = s.compute_solution()
+    if not (sol.direction_vectors == [] and
+            (sol.basepoint - Vector([23/9, 7/9, 2/9])).is_zero()):
+        print ("test case 2 failed")
+
+    # Large coefficients: the elimination residue must not become a pivot.
+    p1 = Plane(normal_vector=Vector([1e5, 2e5, 3e5]), constant_term=6e5)
+    p2 = Plane(normal_vector=Vector([4e5, 5e5, 6e5]), constant_term=1.5e6)
+    p3 = Plane(normal_vector=Vector([7e5, 8e5, 9e5]), constant_term=2.5e6)
+    s = LinearSystem([p1, p2, p3])
+    if not s.compute_solution() == LinearSystem.NO_SOLUTIONS_MSG:
+        print ("test case 3 failed")
+
+    p1 = Plane(normal_vector=Vector([1e6, 2e6, 3e6]), constant_term=6e6)
+    p2 = Plane(normal_vector=Vector([4e6, 5e6, 6e6]), constant_term=15e6)
+    p3 = Plane(normal_vector=Vector([7e6, 8e6, 9e6]), constant_term=24e6)
+    s = LinearSystem([p1, p2, p3])
+    sol = s.compute_solution()
+    if not (len(sol.direction_vectors) == 1 and
+            (sol.basepoint - Vector([0, 3, 0])).is_zero(1e-6)):
+        print ("test case 4 failed")
+
 
     print('-'*80)
     print("Examples")
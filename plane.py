@@ -1,5 +1,5 @@
 import math
-from vector import Vector
+from vector import Vector, Vector3
 from line import Line
 
 
@@ -22,20 +22,20 @@ class Plane(Line):
     This will generate a plane of the form, 2x + 3y +4z = 5
     """
 
-    NO_NONZERO_ELTS_FOUND_MSG = 'No nonzero elements found'
-    
+    __slots__ = ()
+
     def __init__(self, normal_vector=None, constant_term=None):
         #super(Plane, self).__init__(normal_vector, constant_term)
         self.dimension = 3
         if not normal_vector:
-            normal_vector = Vector([0]*self.dimension)
-        self.normal_vector = normal_vector
-        
+            normal_vector = Vector3([0]*self.dimension)
+        elif not isinstance(normal_vector, Vector3) and normal_vector.dimension == 3:
+            normal_vector = Vector3.from_vector(normal_vector)
+
         if not constant_term:
             constant_term = 0
-        self.constant_term = constant_term
-        
-        self.set_basepoint()
+
+        self.set_normal_and_constant(normal_vector, constant_term)
 
 
 if __name__ == '__main__':
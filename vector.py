@@ -1,20 +1,24 @@
 import math
 
+import numpy as np
+
 
 class Vector(object):
     """
     This class gives simple functionalities related to a Vector
     params:
-        coordinates: tuple of vector values
+        coordinates: read-only numpy float64 array of vector values
         dimension: Stores the number of dimensions of the vector,
                    equal to the length of coordinates
 
     Example initialization:
         v = Vector([1, 2, 3])
-        v.coordinates => (1, 2, 3)
+        v.coordinates => array([1., 2., 3.])
         v.dimension => 3
     """
 
+    __slots__ = ('_coordinates', 'dimension', '_magnitude', '_unit')
+
     EMPTY_COORDINATES_MSG = "The Coordinates must be nonempty"
     NON_ITERABLE_COORDINATES_MSG = "The Coordinates must be an iterable"
     ZERO_VECTOR_ERROR_MSG = "Cannot normalize zero vector"
@@ -25,25 +29,38 @@ class Vector(object):
 
     def __init__(self, coordinates):
         try:
-            if not coordinates:
-                raise ValueError(Vector.EMPTY_COORDINATES_MSG)
-            self.coordinates = tuple(x for x in coordinates)
-            self.dimension = len(coordinates)
-        except TypeError:
+            coordinates = np.array(coordinates, dtype=np.float64)
+        except (TypeError, ValueError):
             raise TypeError(Vector.NON_ITERABLE_COORDINATES_MSG)
-    
+        if coordinates.ndim != 1:
+            raise TypeError(Vector.NON_ITERABLE_COORDINATES_MSG)
+        if coordinates.size == 0:
+            raise ValueError(Vector.EMPTY_COORDINATES_MSG)
+
+        # Vectors are immutable; the array is a private, read-only copy.
+        coordinates.flags.writeable = False
+        self._coordinates = coordinates
+        self.dimension = len(coordinates)
+        # magnitude() and normalize() results, computed on first use.
+        self._magnitude = None
+        self._unit = None
+
+    @property
+    def coordinates(self):
+        return self._coordinates
+
     def __str__(self):
         """
         returns vector as a string:
         Vector (v1, v2, v3,...)
         """
-        return "Vector {}".format(self.coordinates)
+        return "Vector {}".format(tuple(self.coordinates.tolist()))
     
     def __eq__(self, v):
         """
         compares 2 vectors for equality;
         """
-        return self.coordinates == v.coordinates
+        return np.array_equal(self.coordinates, v.coordinates)
 
 
     def __add__(self, v):
@@ -52,7 +69,7 @@ class Vector(object):
         """
         if self.dimension != v.dimension:
             raise TypeError('Cannot add Vector of dimensions {} and {}'.format(self.dimension, v.dimension))
-        return Vector([x + y for x, y in zip(self.coordinates, v.coordinates)])
+        return Vector(self.coordinates + v.coordinates)
     
     def __sub__(self, v):
         """
@@ -60,7 +77,7 @@ class Vector(object):
         """
         if self.dimension != v.dimension:
             raise TypeError('Cannot subtract Vector of dimensions {} and {}'.format(self.dimension, v.dimension))
-        return Vector([x - y for x, y in zip(self.coordinates, v.coordinates)])
+        return Vector(self.coordinates - v.coordinates)
 
     def __mul__(self, n):
         """
@@ -70,7 +87,7 @@ class Vector(object):
         if isinstance(n, Vector):
             return self.dot(n)
         else:
-            return Vector([x * n for x in self.coordinates])
+            return Vector(self.coordinates * n)
 
     def __rmul__(self, n):
         """
@@ -87,22 +104,30 @@ class Vector(object):
         returns magnitude of a vector
         magnitude = sqrt(v1 * v1 + v2 * v2 + v3 * v3 +...)
         """
-        return math.sqrt(sum([x * x for x in self.coordinates]))
+        if self._magnitude is None:
+            self._magnitude = math.sqrt(math.fsum([x * x for x in self.coordinates.tolist()]))
+        return self._magnitude
 
     def normalize(self):
         """
         Find unit vector in direction of the current vector
         """
-        magnitude = self.magnitude()
-        if magnitude == 0:
-            raise ZeroDivisionError(Vector.ZERO_VECTOR_ERROR_MSG)
-        return Vector([x / magnitude for x in self.coordinates])
+        if self._unit is None:
+            magnitude = self.magnitude()
+            if magnitude == 0:
+                raise ZeroDivisionError(Vector.ZERO_VECTOR_ERROR_MSG)
+            self._unit = Vector(self.coordinates / magnitude)
+        return self._unit
 
     def dot(self, v):
         """
         Find dot product of the two vectors.
+        The products are summed with math.fsum, which does not accumulate
+        rounding error.
         """
-        return sum([x * y for x, y in zip(self.coordinates, v.coordinates)])
+        if self.dimension != v.dimension:
+            raise TypeError('Cannot dot Vector of dimensions {} and {}'.format(self.dimension, v.dimension))
+        return math.fsum([x * y for x, y in zip(self.coordinates.tolist(), v.coordinates.tolist())])
 
     def angle_with(self, v, in_degrees=False):
         """
@@ -128,7 +153,8 @@ class Vector(object):
         Projection  = magnitude of current vector * unit vector in direction of b.
         """
         try:
-            return self.dot(b.normalize()) * b.normalize()
+            unit_b = b.normalize()
+            return self.dot(unit_b) * unit_b
         except Exception as e:
             if str(e) == Vector.ZERO_VECTOR_ERROR_MSG:
                 raise Exception(Vector.NO_UNIQUE_PARALLEL_COMPONENT_MSG)
@@ -160,15 +186,10 @@ class Vector(object):
         if dimensions of current vector >= 3
         Vector (v1, v2, v3)
         """
-        if self.dimension > 3:
-            return Vector([self.coordinates[i] for i in range(3)])
-        li = []
-        for i in range(3):
-            if i > self.dimension:
-                li.append(0)
-            else:
-                li.append(self.coordinates[i])
-        return Vector(li)
+        coordinates = np.zeros(3)
+        num_coordinates = min(3, self.dimension)
+        coordinates[:num_coordinates] = self.coordinates[:num_coordinates]
+        return Vector(coordinates)
 
     def cross(self, v):
         """
@@ -177,28 +198,18 @@ class Vector(object):
         """
         if self.dimension > 3 or v.dimension > 3:
             raise ValueError(Vector.DIMENSION_MORE_THAN_THREE_MSG)
-        else:
-            print(self)
-            print(v)
-            v1 = self.__make_3d__()
-            v2 = v.__make_3d__()
-            x_1, y_1, z_1 = v1.coordinates
-            x_2, y_2, z_2 = v2.coordinates
+        return Vector(np.cross(self.__make_3d__().coordinates, v.__make_3d__().coordinates))
 
-            li = []
-            li.append(y_1 * z_2 - y_2 * z_1)
-            li.append(-(x_1 * z_2 - z_1 * x_2))
-            li.append(x_1 * y_2 - y_1 * x_2)
-            return Vector(li)
-
-    def is_parallel_to(self, v):
+    def is_parallel_to(self, v, tolerance=1e-10):
         """
         Find whether the current vector is parallel to the given vector.
+        Two vectors are parallel if |v1.v2| = |v1| * |v2|, i.e. the angle
+        between them is 0 or pi; tolerance is relative to |v1| * |v2|.
         """
-        return (self.is_zero() or
-                v.is_zero() or
-                self.angle_with(v) == 0 or
-                self.angle_with(v) == math.pi)
+        if self.is_zero() or v.is_zero():
+            return True
+        magnitudes = self.magnitude() * v.magnitude()
+        return abs(abs(self.dot(v)) - magnitudes) < tolerance * magnitudes
 
     def is_orthogonal_to(self, v, tolerance = 1e-10):
         """
@@ -209,9 +220,103 @@ class Vector(object):
     def is_zero(self, tolerance=1e-10):
         """
         Find whether the current vector is a zero vector.
+        Compares the squared magnitude, so no square root is needed.
         """
-        return self.magnitude() < tolerance
+        return self.dot(self) < tolerance * tolerance
     
+
+class Vector3(Vector):
+    """
+    Vector specialized for 3 dimensions, as used by Plane.
+    The coordinates are kept as the private scalars _c0, _c1, _c2, so
+    arithmetic between two Vector3 is straight-line float code instead of
+    NumPy calls; the read-only coordinates array is only built when it is
+    asked for.
+
+    Example initialization:
+        v = Vector3([1, 2, 3])
+        v.coordinates => array([1., 2., 3.])
+    """
+
+    __slots__ = ('_c0', '_c1', '_c2')
+
+    DIMENSION_NOT_THREE_MSG = "Vector3 must have exactly 3 coordinates"
+
+    def __init__(self, coordinates):
+        super(Vector3, self).__init__(coordinates)
+        if self.dimension != 3:
+            raise ValueError(Vector3.DIMENSION_NOT_THREE_MSG)
+        self._c0, self._c1, self._c2 = self._coordinates.tolist()
+
+    @classmethod
+    def from_scalars(cls, c0, c1, c2):
+        """
+        Builds a Vector3 straight from its 3 coordinates, without NumPy.
+        """
+        v = object.__new__(cls)
+        v._c0, v._c1, v._c2 = c0, c1, c2
+        v._coordinates = None
+        v.dimension = 3
+        v._magnitude = None
+        v._unit = None
+        return v
+
+    @classmethod
+    def from_vector(cls, v):
+        """
+        Builds a Vector3 from a 3 dimensional Vector, sharing its
+        read-only coordinates array instead of copying it.
+        """
+        if v.dimension != 3:
+            raise ValueError(Vector3.DIMENSION_NOT_THREE_MSG)
+        c0, c1, c2 = v.coordinates.tolist()
+        v3 = cls.from_scalars(c0, c1, c2)
+        v3._coordinates = v.coordinates
+        return v3
+
+    @property
+    def coordinates(self):
+        if self._coordinates is None:
+            coordinates = np.array((self._c0, self._c1, self._c2), dtype=np.float64)
+            coordinates.flags.writeable = False
+            self._coordinates = coordinates
+        return self._coordinates
+
+    def __add__(self, v):
+        if isinstance(v, Vector3):
+            return Vector3.from_scalars(self._c0 + v._c0, self._c1 + v._c1, self._c2 + v._c2)
+        return super(Vector3, self).__add__(v)
+
+    def __sub__(self, v):
+        if isinstance(v, Vector3):
+            return Vector3.from_scalars(self._c0 - v._c0, self._c1 - v._c1, self._c2 - v._c2)
+        return super(Vector3, self).__sub__(v)
+
+    def __mul__(self, n):
+        if isinstance(n, Vector):
+            return self.dot(n)
+        n = float(n)
+        return Vector3.from_scalars(self._c0 * n, self._c1 * n, self._c2 * n)
+
+    def magnitude(self):
+        if self._magnitude is None:
+            self._magnitude = math.sqrt(self.dot(self))
+        return self._magnitude
+
+    def normalize(self):
+        if self._unit is None:
+            magnitude = self.magnitude()
+            if magnitude == 0:
+                raise ZeroDivisionError(Vector.ZERO_VECTOR_ERROR_MSG)
+            self._unit = Vector3.from_scalars(self._c0 / magnitude, self._c1 / magnitude, self._c2 / magnitude)
+        return self._unit
+
+    def dot(self, v):
+        if isinstance(v, Vector3):
+            return math.fsum((self._c0 * v._c0, self._c1 * v._c1, self._c2 * v._c2))
+        return super(Vector3, self).dot(v)
+
+
 if __name__ == '__main__':
     my_vector = Vector([1, 2, 3])
     print(my_vector)